@@ -0,0 +1,234 @@
+"""
+Renders the sweep animation for a whole grid of settings, without a star attached.
+Instead of flashing every combination of settings onto the star, define the grid at the top of
+this file and run it on your laptop. Every combination is rendered for one full cycle of the
+animation, spread over all cores, and ends up in the output directory as:
+ - <hash>.npz: the frames, one brightness value per led per frame, from 0 to 255 (which is
+   the scale that's stored along with them, usually MAX_BRIGHTNESS)
+ - <hash>.png: a contact sheet with a selection of the frames, to quickly see what it looks like
+ - index.json: which settings belong to which hash
+The hash is based on the settings, so running it again only renders the new combinations.
+"""
+import hashlib
+import itertools
+import json
+import os
+import struct
+import zlib
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+import numpy as NP
+
+import effects
+import sweep
+from compositor import Compositor, get_effect_layers, get_group_masks
+
+# Every combination of these settings is rendered. Settings that are left out get the value from sweep.py
+GRID = {
+    "MODE": ["x", "y", "radial", "angular"],
+    "FUZZINESS": [0.01, 0.05, 0.2],
+    "ANIMATION_SPEED": [0.1, 0.2],
+    "R_SMALL": [None],      # None picks the same R_SMALL as sweep.py does for the mode
+    "BOOMERANG": [False, True],
+}
+OUTPUT_DIR = "renders"
+MAX_FRAMES = 10000          # Stop rendering a cycle after this many frames
+CONTACT_SHEET_FRAMES = 32   # Number of frames on the contact sheet
+TILE_SIZE = 48              # Size of a frame on the contact sheet in pixels
+# Bump this when the rendering changes, so old renders are not reused
+RENDER_VERSION = 1
+
+
+class HeadlessStar:
+    # Stands in for the Star when there is no star. calculate_led_positions only needs the leds,
+    # and the compositor the groups: the center led first, then the 25 leds on the points.
+    namedtuple = namedtuple("HeadlessStar", ("inner", "outer"))
+
+    def __init__(self):
+        self.leds = [object() for _ in range(26)]
+        self.inner = self.leds[0]
+        self.outer = SimpleNamespace(leds=self.leds[1:])
+
+
+def get_settings(combination):
+    settings = {
+        "MODE": sweep.MODE,
+        "MAX_BRIGHTNESS": sweep.MAX_BRIGHTNESS,
+        "CENTER_MIN_BRIGHTNESS": sweep.CENTER_MIN_BRIGHTNESS,
+        "FUZZINESS": sweep.FUZZINESS,
+        "BOOMERANG": sweep.BOOMERANG,
+        "ANIMATION_SPEED": sweep.ANIMATION_SPEED,
+        "R_BIG": 1,
+        "R_SMALL": None,
+    }
+    settings.update(combination)
+    if settings["R_SMALL"] is None:
+        # The same choice sweep.py makes
+        if settings["MODE"] == "radial":
+            settings["R_SMALL"] = settings["R_BIG"] / 5
+        else:
+            settings["R_SMALL"] = settings["R_BIG"] * 3.5 / 5
+    return settings
+
+
+def get_hash(settings):
+    key = json.dumps({"version": RENDER_VERSION, **settings}, sort_keys=True)
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def get_leds(star, settings):
+    r_big, r_small = settings["R_BIG"], settings["R_SMALL"]
+    r_center = r_small - (r_big - r_small) / 10
+    return sweep.calculate_led_positions(star, r_big, r_small, r_center)
+
+
+def render_cycle(settings):
+    """Renders one full cycle of the animation, just like sweep.animate would show it
+    :return: array with a row of led brightnesses for every frame
+    """
+    r_big = settings["R_BIG"]
+    star = HeadlessStar()
+    leds = get_leds(star, settings)
+    effect, kernel = effects.prepare(
+        settings["MODE"],
+        leds,
+        r_big,
+        fuzziness=settings["FUZZINESS"],
+        max_brightness=settings["MAX_BRIGHTNESS"],
+    )
+    min_blink_coordinate, max_blink_coordinate = effect.get_blink_range(r_big)
+    compositor = Compositor(get_group_masks(star, leds))
+    center_min_value = settings["CENTER_MIN_BRIGHTNESS"]
+    boomerang = settings["BOOMERANG"]
+
+    blink_coordinate = min_blink_coordinate
+    animation_speed = settings["ANIMATION_SPEED"]
+    frames = []
+    while len(frames) < MAX_FRAMES:
+        led_filter = compositor.flatten(
+            get_effect_layers(kernel(blink_coordinate), effect.LIGHTS_CENTER, center_min_value)
+        )
+        frames.append(NP.array(led_filter))
+
+        last_speed = animation_speed
+        blink_coordinate, animation_speed = sweep.step_coordinate(
+            blink_coordinate, animation_speed, min_blink_coordinate, max_blink_coordinate, boomerang
+        )
+        # A cycle ends when the sweep starts over, or with boomerang, when it turns around at the start
+        if not boomerang and blink_coordinate == min_blink_coordinate:
+            break
+        if boomerang and last_speed < 0 < animation_speed:
+            break
+    return NP.array(frames)
+
+
+def write_png(path, pixels):
+    """Writes a grayscale image, without needing an imaging library
+    :param pixels: 2D array with values between 0 and 255
+    """
+    height, width = pixels.shape
+    # Every row starts with filter type 0 (none)
+    raw = NP.zeros((height, width + 1), dtype=NP.uint8)
+    raw[:, 1:] = pixels
+
+    def chunk(kind, data):
+        return (
+            struct.pack("!I", len(data))
+            + kind
+            + data
+            + struct.pack("!I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+        )
+
+    with open(path, "wb") as png:
+        png.write(b"\x89PNG\r\n\x1a\n")
+        png.write(chunk(b"IHDR", struct.pack("!IIBBBBB", width, height, 8, 0, 0, 0, 0)))
+        png.write(chunk(b"IDAT", zlib.compress(raw.tobytes(), 9)))
+        png.write(chunk(b"IEND", b""))
+
+
+def contact_sheet(frames, positions, max_brightness):
+    """Draws a selection of the frames next to each other
+    :param frames: array with a row of led brightnesses for every frame
+    :param positions: x,y position of every led
+    :return: 2D array with the pixels of the contact sheet
+    """
+    selection = NP.unique(NP.linspace(0, len(frames) - 1, CONTACT_SHEET_FRAMES).astype(int))
+    columns = min(8, len(selection))
+    rows = -(-len(selection) // columns)
+    sheet = NP.zeros((rows * TILE_SIZE, columns * TILE_SIZE), dtype=NP.uint8)
+
+    # Position of the leds within a tile, with the y-axis pointing up
+    positions = NP.array(positions)
+    size = NP.abs(positions).max() or 1
+    centers = (TILE_SIZE / 2 + positions / size * (TILE_SIZE / 2 - 4)).astype(int)
+    centers[:, 1] = TILE_SIZE - 1 - centers[:, 1]
+
+    for tile, frame_no in enumerate(selection):
+        top = (tile // columns) * TILE_SIZE
+        left = (tile % columns) * TILE_SIZE
+        # Scale to the max brightness, otherwise the dim leds are hard to see
+        values = NP.clip(frames[frame_no] / max_brightness, 0, 1) * 255
+        for (x, y), value in zip(centers, values):
+            sheet[top + y - 1:top + y + 2, left + x - 1:left + x + 2] = max(int(value), 24)
+    return sheet
+
+
+def render(settings, output_dir):
+    """Renders one combination of settings, unless it has been rendered before
+    :return: the hash of the settings and whether it was rendered (or cached)
+    """
+    key = get_hash(settings)
+    frames_path = os.path.join(output_dir, f"{key}.npz")
+    sheet_path = os.path.join(output_dir, f"{key}.png")
+    if os.path.exists(frames_path) and os.path.exists(sheet_path):
+        return key, False
+
+    frames = render_cycle(settings)
+    # The leds never get brighter than this, so use all 256 steps for the range up to it
+    scale = max(settings["MAX_BRIGHTNESS"], settings["CENTER_MIN_BRIGHTNESS"]) or 1
+    quantized = NP.round(NP.clip(frames / scale, 0, 1) * 255).astype(NP.uint8)
+    # Write to a temporary file first, so an interrupted run doesn't leave half a file behind
+    NP.savez_compressed(
+        frames_path + ".tmp.npz", frames=quantized, scale=scale, settings=json.dumps(settings)
+    )
+    os.replace(frames_path + ".tmp.npz", frames_path)
+
+    positions = [led.get_cartesian() for led in get_leds(HeadlessStar(), settings)]
+    write_png(sheet_path, contact_sheet(frames, positions, scale))
+    return key, True
+
+
+def render_grid(grid, output_dir=OUTPUT_DIR, workers=None):
+    """Renders every combination of the settings in the grid on a pool of processes
+    :param grid: dict with the name of a setting and a list of values to try
+    :param workers: number of processes, defaults to the number of cores
+    :return: dict with the hash and the settings of every combination
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    names = list(grid)
+    combinations = [
+        get_settings(dict(zip(names, values)))
+        for values in itertools.product(*(grid[name] for name in names))
+    ]
+
+    index_path = os.path.join(output_dir, "index.json")
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path) as index_file:
+            index = json.load(index_file)
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        results = pool.map(render, combinations, itertools.repeat(output_dir))
+        for settings, (key, rendered) in zip(combinations, results):
+            index[key] = settings
+            print(f"{'rendered' if rendered else 'cached  '} {key} {settings}")
+
+    with open(index_path, "w") as index_file:
+        json.dump(index, index_file, indent=2, sort_keys=True)
+    return index
+
+
+if __name__ == "__main__":
+    render_grid(GRID)
@@ -0,0 +1,203 @@
+"""
+Keeps the clocks of several stars in sync, so they can play the same show in lockstep.
+One Pi is the master. It decides when the show started (the epoch) and answers timestamp
+requests over UDP. The other Pis poll the master every second and work out how far their
+own clock is off (the offset) and how fast it drifts away, the same way NTP does it:
+
+    t0: follower sends a request       t1: master receives it
+    t3: follower receives the reply    t2: master sends the reply
+
+    offset = ((t1 - t0) + (t2 - t3)) / 2
+    delay = (t3 - t0) - (t2 - t1)
+
+Only the samples with the shortest round trip are trusted, and a straight line through them
+gives both the offset and the drift. Both the master and the followers have a show_time()
+method, which returns the number of seconds since the epoch on the master's clock.
+To try it out on a single computer, run these in separate terminals:
+
+    python clocksync.py master
+    python clocksync.py follower 127.0.0.1
+"""
+import socket
+import struct
+import sys
+import threading
+from collections import deque
+from time import monotonic, sleep
+
+SYNC_PORT = 8028
+# A request is a magic word and t0, a reply is a magic word followed by t0, t1, t2 and the epoch
+REQUEST = struct.Struct("!4sd")
+REPLY = struct.Struct("!4s4d")
+REQUEST_MAGIC = b"RPS?"
+REPLY_MAGIC = b"RPS!"
+
+
+class SyncMaster:
+    def __init__(self, host="0.0.0.0", port=SYNC_PORT, epoch=None):
+        """
+        :param host: address to listen on
+        :param port: UDP port to listen on, use 0 to pick a free one
+        :param epoch: start of the show on the monotonic clock, defaults to now
+        """
+        self.epoch = monotonic() if epoch is None else epoch
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+        self.port = self.socket.getsockname()[1]
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        self.socket.close()
+
+    def serve(self):
+        while self.running:
+            try:
+                data, address = self.socket.recvfrom(REQUEST.size)
+            except OSError:
+                # The socket was closed
+                break
+            t1 = monotonic()
+            if len(data) != REQUEST.size:
+                continue
+            magic, t0 = REQUEST.unpack(data)
+            if magic != REQUEST_MAGIC:
+                continue
+            reply = REPLY.pack(REPLY_MAGIC, t0, t1, monotonic(), self.epoch)
+            try:
+                self.socket.sendto(reply, address)
+            except OSError:
+                pass
+
+    def is_synced(self):
+        return True
+
+    def show_time(self):
+        return monotonic() - self.epoch
+
+
+class SyncClock:
+    def __init__(self, master, port=SYNC_PORT, interval=1.0, window=16, timeout=0.5):
+        """
+        :param master: hostname or address of the master
+        :param port: UDP port the master listens on
+        :param interval: seconds between two timestamp exchanges
+        :param window: number of exchanges to base the estimate on
+        :param timeout: seconds to wait for a reply before giving up on an exchange
+        """
+        self.master = (master, port)
+        self.interval = interval
+        self.timeout = timeout
+        self.samples = deque(maxlen=window)
+        self.epoch = None
+        # The master's clock is estimated as: local + offset + drift * (local - reference)
+        self.offset = 0.0
+        self.drift = 0.0
+        self.reference = 0.0
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.poll, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+
+    def poll(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.settimeout(self.timeout)
+            while self.running:
+                self.exchange(sock)
+                sleep(self.interval)
+
+    def exchange(self, sock):
+        t0 = monotonic()
+        try:
+            sock.sendto(REQUEST.pack(REQUEST_MAGIC, t0), self.master)
+            while True:
+                data = sock.recv(REPLY.size)
+                t3 = monotonic()
+                if len(data) != REPLY.size:
+                    continue
+                magic, sent, t1, t2, epoch = REPLY.unpack(data)
+                # Ignore late replies to earlier requests
+                if magic == REPLY_MAGIC and sent == t0:
+                    break
+        except OSError:
+            # No reply in time, try again next round
+            return False
+
+        offset = ((t1 - t0) + (t2 - t3)) / 2
+        delay = (t3 - t0) - (t2 - t1)
+        with self.lock:
+            if epoch != self.epoch:
+                # The master (re)started, the samples of its old clock don't count anymore
+                self.samples.clear()
+            self.epoch = epoch
+            self.samples.append(((t0 + t3) / 2, offset, delay))
+            self.estimate()
+        return True
+
+    def estimate(self):
+        # Packets that took long were probably stuck in a queue somewhere, so only use the fastest half
+        samples = sorted(self.samples, key=lambda sample: sample[2])
+        samples = samples[:max(1, (len(samples) + 1) // 2)]
+
+        # Fit a straight line through the offsets to find the drift
+        reference = sum(sample[0] for sample in samples) / len(samples)
+        offset = sum(sample[1] for sample in samples) / len(samples)
+        spread = sum((sample[0] - reference) ** 2 for sample in samples)
+        if spread > 0:
+            drift = sum(
+                (sample[0] - reference) * (sample[1] - offset) for sample in samples
+            ) / spread
+        else:
+            drift = 0.0
+        self.reference, self.offset, self.drift = reference, offset, drift
+
+    def is_synced(self):
+        return self.epoch is not None
+
+    def master_time(self):
+        now = monotonic()
+        with self.lock:
+            return now + self.offset + self.drift * (now - self.reference)
+
+    def show_time(self):
+        """Seconds since the epoch on the master's clock
+        :return: show time, or None when we haven't heard from the master yet
+        """
+        if self.epoch is None:
+            return None
+        return self.master_time() - self.epoch
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "master":
+        clock = SyncMaster().start()
+    elif len(sys.argv) > 2 and sys.argv[1] == "follower":
+        clock = SyncClock(sys.argv[2]).start()
+    else:
+        print("Usage: python clocksync.py master | follower <master address>")
+        sys.exit(1)
+
+    try:
+        while True:
+            sleep(1)
+            if clock.is_synced():
+                print(f"show time: {clock.show_time():.4f}")
+            else:
+                print("waiting for master...")
+    except KeyboardInterrupt:
+        clock.stop()
@@ -0,0 +1,105 @@
+"""
+Stacks several effects on top of each other.
+Every layer is the output of an effect (one brightness value per led), with its own opacity,
+mask and blend mode. The compositor flattens the stack from bottom to top:
+
+    max:      the brightest of the two wins
+    add:      the light of both adds up
+    multiply: the layer dims whatever is below it
+    alpha:    the layer covers whatever is below it
+
+Opacity and mask fade between the result of the blend and what was there before, so a mask
+of 0 leaves a led alone and a mask of 1 blends it completely. Masks can be arrays or the name
+of one of the groups of the Star, e.g. "inner" for the center led and "outer" for the points.
+"""
+import numpy as NP
+
+BLEND_MODES = ("max", "add", "multiply", "alpha")
+
+
+def get_group_masks(star, leds):
+    """Creates a mask for every group of leds on the star
+    :param star: the Star (or any other LEDBoard)
+    :param leds: list of Led objects as returned by calculate_led_positions
+    :return: dict with the name of the group and an array with 1 for every led in the group
+    """
+    masks = {"all": NP.ones(len(leds))}
+    for name in star.namedtuple._fields:
+        group = getattr(star, name)
+        members = getattr(group, "leds", (group,))
+        masks[name] = NP.array(
+            [1.0 if any(led.get_led() is member for member in members) else 0.0 for led in leds]
+        )
+    return masks
+
+
+class Layer:
+    def __init__(self, values, opacity=1.0, mask=None, blend="max"):
+        """
+        :param values: brightness of every led, or one value for all of them
+        :param opacity: between 0 (invisible) and 1
+        :param mask: name of a group, an array with a value between 0 and 1 for every led, or None for all leds
+        :param blend: "max", "add", "multiply" or "alpha"
+        """
+        if blend not in BLEND_MODES:
+            raise ValueError(
+                f"Blend mode '{blend}' not supported. Choose 'max', 'add', 'multiply' or 'alpha'"
+            )
+        self.values = values
+        self.opacity = opacity
+        self.mask = mask
+        self.blend = blend
+
+
+def get_effect_layers(values, lights_center, center_min_value):
+    """The stack the animations use: an effect, with the center led glowing at least a little bit
+    :param values: output of the effect, one brightness value per led
+    :param lights_center: False for effects that don't light up the center led, e.g. because it has no angle
+    :param center_min_value: minimum brightness of the center led
+    """
+    return [
+        Layer(values, mask=None if lights_center else "outer"),
+        Layer(center_min_value, mask="inner"),
+    ]
+
+
+class Compositor:
+    def __init__(self, masks):
+        """
+        :param masks: dict of named masks, see get_group_masks
+        """
+        self.masks = masks
+        led_count = len(next(iter(masks.values())))
+        # Buffers that are reused every frame
+        self.frame = NP.zeros(led_count)
+        self.blended = NP.zeros(led_count)
+        self.weight = NP.zeros(led_count)
+
+    def flatten(self, layers):
+        """Flattens a stack of layers, the first layer is at the bottom
+        :return: brightness of every led between 0 and 1. This is a buffer that's reused every frame.
+        """
+        frame, blended, weight = self.frame, self.blended, self.weight
+        frame.fill(0)
+        for layer in layers:
+            if layer.blend == "max":
+                NP.maximum(frame, layer.values, out=blended)
+            elif layer.blend == "add":
+                NP.add(frame, layer.values, out=blended)
+            elif layer.blend == "multiply":
+                NP.multiply(frame, layer.values, out=blended)
+            else:
+                blended[:] = layer.values
+
+            # frame = frame + opacity * mask * (blended - frame)
+            mask = self.masks[layer.mask] if isinstance(layer.mask, str) else layer.mask
+            blended -= frame
+            if mask is None:
+                blended *= layer.opacity
+            else:
+                NP.multiply(mask, layer.opacity, out=weight)
+                blended *= weight
+            frame += blended
+
+        NP.clip(frame, 0, 1, out=frame)
+        return frame
@@ -0,0 +1,67 @@
+"""
+All effects the star can show, by name.
+Every effect lives in its own module, which is only imported when the effect is actually used.
+An effect module has:
+ - PARAMETERS: dict with the parameters of the effect and their default values
+ - LIGHTS_CENTER: False if the effect leaves the center led alone
+ - get_blink_range(star_size): the [min, max] blink coordinate the animation sweeps over
+ - get_coordinates(leds): the coordinate of every led along that sweep, or None if the sweep
+   covers the whole star all the time
+ - precompute(leds, star_size, **parameters): does all the work that doesn't change between
+   frames and returns a kernel. Calling kernel(blink_coordinate) returns the brightness of every led.
+
+To add an effect, write a module like that and add it to EFFECTS (or call register).
+"""
+import importlib
+
+EFFECTS = {
+    "x": "effects.x",
+    "y": "effects.y",
+    "radial": "effects.radial",
+    "angular": "effects.angular",
+    "flicker": "effects.flicker",
+    "flames": "effects.flames",
+    "aurora": "effects.aurora",
+}
+
+# Overrides for scripts that measure distances in the same units as the star size (e.g. cm)
+# instead of relative to it, and use the angle itself for the angular mode
+ABSOLUTE_UNITS = {"relative": False, "arc": False}
+
+
+def register(name, module):
+    """Adds an effect
+    :param name: name of the effect, e.g. the MODE in the scripts
+    :param module: dotted name of the module with the effect
+    """
+    EFFECTS[name] = module
+
+
+def load(name):
+    if name not in EFFECTS:
+        choices = ", ".join(f"'{effect}'" for effect in EFFECTS)
+        raise ValueError(f"Mode '{name}' not supported. Choose {choices}")
+    return importlib.import_module(EFFECTS[name])
+
+
+def prepare(name, leds, star_size, overrides=None, **parameters):
+    """Loads an effect and precomputes it for these leds
+    :param overrides: dict with parameter values for the effects that have those parameters,
+                      the other effects ignore them, e.g. ABSOLUTE_UNITS
+    :param parameters: any of the effect's PARAMETERS, the others get their default value
+    :return: the effect module and its kernel
+    """
+    effect = load(name)
+    if overrides:
+        parameters = {
+            **{key: value for key, value in overrides.items() if key in effect.PARAMETERS},
+            **parameters,
+        }
+    unknown = set(parameters) - set(effect.PARAMETERS)
+    if unknown:
+        raise ValueError(
+            f"Effect '{name}' has no parameter(s) {', '.join(sorted(unknown))}. "
+            f"Choose from {', '.join(effect.PARAMETERS)}"
+        )
+    parameters = {**effect.PARAMETERS, **parameters}
+    return effect, effect.precompute(leds, star_size, **parameters)
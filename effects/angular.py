@@ -0,0 +1,48 @@
+"""Rotates a line around the center of the star, like the hand of a clock"""
+import math
+import numpy as NP
+from effects.falloff import get_corr_factor
+
+# arc: measure the distance along the circle through the led (relative to the star size),
+#      instead of just the difference in angle
+PARAMETERS = {"fuzziness": 1, "max_brightness": 0.1, "arc": True}
+# The center led doesn't have an angle
+LIGHTS_CENTER = False
+
+
+def get_blink_range(star_size):
+    return -math.pi, math.pi
+
+
+def get_coordinates(leds):
+    # The hand always points at some part of the star
+    return None
+
+
+def precompute(leds, star_size, fuzziness, max_brightness, arc):
+    angles = NP.array([led.get_polar()[1] for led in leds], dtype=float)
+    if arc:
+        radius = NP.array([led.get_polar()[0] for led in leds], dtype=float) / star_size
+        factor = get_corr_factor(fuzziness)
+    else:
+        factor = 3 * get_corr_factor(fuzziness)
+    led_filter = NP.zeros(len(leds))
+    other_way = NP.zeros(len(leds))
+
+    def kernel(blink_coordinate):
+        # The shortest way around the circle
+        NP.subtract(angles, blink_coordinate, out=led_filter)
+        NP.abs(led_filter, out=led_filter)
+        NP.subtract(2 * math.pi, led_filter, out=other_way)
+        NP.minimum(led_filter, other_way, out=led_filter)
+        if arc:
+            NP.sin(led_filter, out=led_filter)
+            NP.multiply(led_filter, radius, out=led_filter)
+        NP.multiply(led_filter, factor, out=led_filter)
+        NP.tanh(led_filter, out=led_filter)
+        NP.subtract(1, led_filter, out=led_filter)
+        NP.round(led_filter, 2, out=led_filter)
+        NP.multiply(led_filter, max_brightness, out=led_filter)
+        return led_filter
+
+    return kernel
@@ -0,0 +1,28 @@
+"""Slowly shimmering bands of light, like the northern lights"""
+import numpy as NP
+from effects.noise import BLINK_RANGE, get_scale, led_noise_kernel
+
+# fuzziness: how wide the bands are
+# speed: how fast the bands shimmer
+PARAMETERS = {"fuzziness": 0.5, "max_brightness": 0.1, "speed": 0.05, "seed": 0}
+LIGHTS_CENTER = True
+
+
+def get_blink_range(star_size):
+    return BLINK_RANGE
+
+
+def get_coordinates(leds):
+    # The aurora covers the whole sky
+    return None
+
+
+def precompute(leds, star_size, fuzziness, max_brightness, speed, seed):
+    # Stretch the noise along the x-axis, so it forms horizontal bands
+    noise = led_noise_kernel(leds, star_size, get_scale(fuzziness), speed, seed, stretch_x=0.3, stretch_y=1.5)
+
+    def kernel(blink_coordinate):
+        glow = NP.clip(0.5 + 1.2 * noise(blink_coordinate), 0, 1)
+        return max_brightness * glow * glow
+
+    return kernel
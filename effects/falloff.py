@@ -0,0 +1,37 @@
+"""
+The falloff shared by the effects: leds close to the blink coordinate light up, the ones
+further away fade out with a tanh:
+
+    brightness = max_brightness * round(1 - tanh(distance * corr_factor), 2)
+"""
+import numpy as NP
+
+
+def get_corr_factor(fuzziness):
+    if fuzziness == 0:
+        return 1000
+    return 1 / fuzziness
+
+
+def sweep_kernel(coordinates, scale, fuzziness, max_brightness):
+    """Builds a kernel that lights up the leds close to the blink coordinate
+    :param coordinates: coordinate of every led along the sweep
+    :param scale: distances are divided by this, e.g. the star size
+    :return: kernel(blink_coordinate) that returns the brightness of every led
+    """
+    coordinates = NP.array(coordinates, dtype=float)
+    factor = get_corr_factor(fuzziness) / scale
+    led_filter = NP.zeros(len(coordinates))
+
+    def kernel(blink_coordinate):
+        # max_brightness * round(1 - tanh(|coordinate - blink| * factor), 2), without allocating anything
+        NP.subtract(coordinates, blink_coordinate, out=led_filter)
+        NP.abs(led_filter, out=led_filter)
+        NP.multiply(led_filter, factor, out=led_filter)
+        NP.tanh(led_filter, out=led_filter)
+        NP.subtract(1, led_filter, out=led_filter)
+        NP.round(led_filter, 2, out=led_filter)
+        NP.multiply(led_filter, max_brightness, out=led_filter)
+        return led_filter
+
+    return kernel
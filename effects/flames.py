@@ -0,0 +1,35 @@
+"""Flames licking up the star from the bottom"""
+import numpy as NP
+from effects.noise import BLINK_RANGE, get_scale, led_noise_kernel
+
+# fuzziness: how big the tongues of the flames are
+# speed: how fast the flames move
+# height: how far up the star the flames reach (between 0 and 1)
+PARAMETERS = {"fuzziness": 0.5, "max_brightness": 0.1, "speed": 0.3, "height": 0.6, "seed": 0}
+LIGHTS_CENTER = True
+
+
+def get_blink_range(star_size):
+    return BLINK_RANGE
+
+
+def get_coordinates(leds):
+    # The flames are always burning
+    return None
+
+
+def precompute(leds, star_size, fuzziness, max_brightness, speed, height, seed):
+    # The fire is hottest at the bottom of the star
+    ys = NP.array([led.get_cartesian()[1] for led in leds], dtype=float)
+    bottom, top = ys.min(), ys.max()
+    heat = NP.clip(1 - (ys - bottom) / ((top - bottom) * max(height, 0.01)), 0, 1)
+    # Two layers of noise, the second one finer and faster, gives the flames their tongues
+    scale = get_scale(fuzziness)
+    coarse = led_noise_kernel(leds, star_size, scale, speed, seed, stretch_y=0.5)
+    fine = led_noise_kernel(leds, star_size, 2 * scale, 2 * speed, seed + 1, stretch_y=0.5)
+
+    def kernel(blink_coordinate):
+        flicker = coarse(blink_coordinate) + 0.5 * fine(blink_coordinate)
+        return max_brightness * NP.clip(heat * 1.2 - 0.2 + 0.8 * flicker, 0, 1)
+
+    return kernel
@@ -0,0 +1,28 @@
+"""Every led flickers like a candle"""
+import numpy as NP
+from effects.noise import BLINK_RANGE, get_scale, led_noise_kernel
+
+# fuzziness: how much neighbouring leds flicker alike
+# speed: how fast the flicker changes
+# depth: how much the leds dim when they flicker (between 0 and 1)
+PARAMETERS = {"fuzziness": 0.3, "max_brightness": 0.1, "speed": 0.5, "depth": 0.7, "seed": 0}
+LIGHTS_CENTER = True
+
+
+def get_blink_range(star_size):
+    return BLINK_RANGE
+
+
+def get_coordinates(leds):
+    # The whole star flickers all the time
+    return None
+
+
+def precompute(leds, star_size, fuzziness, max_brightness, speed, depth, seed):
+    noise = led_noise_kernel(leds, star_size, get_scale(fuzziness), speed, seed)
+
+    def kernel(blink_coordinate):
+        dimming = depth * (0.5 + 0.5 * noise(blink_coordinate))
+        return max_brightness * NP.clip(1 - dimming, 0, 1)
+
+    return kernel
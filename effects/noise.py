@@ -0,0 +1,118 @@
+"""
+3D Perlin noise for the leds, with time as the third dimension.
+The leds never move, so everything that only depends on x and y is worked out once: which
+lattice cell every led is in, the hash of the corners of that cell, the dot product of every
+possible gradient with the offset to every corner and the interpolation weights. Every frame
+only the time slice is left: one lookup in the hash table, and a handful of vectorized
+operations on 26 x 8 numbers.
+"""
+import numpy as NP
+
+# The 12 edges of a cube, the classic gradients for 3D Perlin noise
+GRADIENTS = NP.array([
+    [1, 1, 0], [-1, 1, 0], [1, -1, 0], [-1, -1, 0],
+    [1, 0, 1], [-1, 0, 1], [1, 0, -1], [-1, 0, -1],
+    [0, 1, 1], [0, -1, 1], [0, 1, -1], [0, -1, -1],
+], dtype=float)
+
+# The 8 corners of a lattice cell: 4 in the x,y plane, at the bottom and the top of the time slice
+CORNER_X = NP.array([0, 1, 0, 1, 0, 1, 0, 1])
+CORNER_Y = NP.array([0, 0, 1, 1, 0, 0, 1, 1])
+CORNER_Z = NP.array([0, 0, 0, 0, 1, 1, 1, 1])
+
+
+def fade(t):
+    # Perlin's smootherstep: 6t^5 - 15t^4 + 10t^3
+    return t * t * t * (t * (t * 6 - 15) + 10)
+
+
+def noise_kernel(xs, ys, period=256, seed=0):
+    """Builds a kernel that samples the noise at fixed x,y positions for any time
+    :param xs: x coordinate of every led, in lattice cells
+    :param ys: y coordinate of every led, in lattice cells
+    :param period: the noise repeats itself after this many lattice cells in time (at most 256)
+    :param seed: every seed gives different noise
+    :return: kernel(t) that returns the noise (roughly between -1 and 1) for every led
+    """
+    rng = NP.random.default_rng(seed)
+    # Permutation table, twice, so hashes of neighbouring cells don't need wrapping
+    permutation = rng.permutation(256)
+    permutation = NP.concatenate([permutation, permutation])
+    gradient_index = permutation % len(GRADIENTS)
+    period = max(1, min(256, int(period)))
+
+    xs = NP.asarray(xs, dtype=float)
+    ys = NP.asarray(ys, dtype=float)
+    led_count = len(xs)
+    cell_x = NP.floor(xs)
+    cell_y = NP.floor(ys)
+    offset_x = xs - cell_x
+    offset_y = ys - cell_y
+    cell_x = cell_x.astype(int) & 255
+    cell_y = cell_y.astype(int) & 255
+
+    # Hash of the x,y part of every corner, so only the time still has to be added
+    hash_xy = permutation[
+        permutation[cell_x[:, NP.newaxis] + CORNER_X] + cell_y[:, NP.newaxis] + CORNER_Y
+    ]
+    # Dot product of every gradient with the x,y part of the offset to every corner
+    to_corner_x = offset_x[:, NP.newaxis] - CORNER_X
+    to_corner_y = offset_y[:, NP.newaxis] - CORNER_Y
+    spatial_dot = (
+        to_corner_x[:, :, NP.newaxis] * GRADIENTS[:, 0]
+        + to_corner_y[:, :, NP.newaxis] * GRADIENTS[:, 1]
+    ).ravel()
+    # Where the dot products of each led and corner start in spatial_dot
+    spatial_start = NP.arange(led_count * 8).reshape(led_count, 8) * len(GRADIENTS)
+    # Interpolation weights in the x,y plane
+    u = fade(offset_x)[:, NP.newaxis]
+    v = fade(offset_y)[:, NP.newaxis]
+    weight_xy = NP.where(CORNER_X, u, 1 - u) * NP.where(CORNER_Y, v, 1 - v)
+    gradient_z = GRADIENTS[:, 2]
+
+    def kernel(t):
+        cell_t = int(NP.floor(t))
+        offset_t = t - cell_t
+        w = fade(offset_t)
+
+        # Pick the gradient of every corner
+        gradient = gradient_index[hash_xy + (cell_t + CORNER_Z) % period]
+        # Dot product of the gradient with the offset to the corner: the x,y part is
+        # precomputed, only the time part is added here
+        dot = spatial_dot[spatial_start + gradient] + gradient_z[gradient] * (offset_t - CORNER_Z)
+        # Interpolate between the 8 corners
+        weight = weight_xy * NP.where(CORNER_Z, w, 1 - w)
+        return NP.sum(dot * weight, axis=1)
+
+    return kernel
+
+
+# The noise effects run the blink coordinate from 0 to 256 and back to 0. The noise is made to
+# repeat itself over that range, so it loops without a hiccup.
+BLINK_RANGE = (0, 256)
+
+
+def led_noise_kernel(leds, star_size, scale, speed, seed, stretch_x=1.0, stretch_y=1.0):
+    """Builds a noise kernel for the leds on the star
+    :param scale: number of lattice cells across the star, more cells means finer noise
+    :param speed: number of lattice cells the noise moves per unit of blink coordinate
+    :param stretch_x: stretches the noise along the x-axis (a bigger number means finer noise)
+    :param stretch_y: same, along the y-axis
+    :return: kernel(blink_coordinate) that returns the noise for every led
+    """
+    # Leds right on a lattice point would always be 0, so shift the star a bit
+    xs = [led.get_cartesian()[0] / star_size * scale * stretch_x + 0.37 for led in leds]
+    ys = [led.get_cartesian()[1] / star_size * scale * stretch_y + 0.71 for led in leds]
+    period = max(1, min(256, round(BLINK_RANGE[1] * speed)))
+    kernel = noise_kernel(xs, ys, period=period, seed=seed)
+    time_scale = period / BLINK_RANGE[1]
+
+    def led_kernel(blink_coordinate):
+        return kernel(blink_coordinate * time_scale)
+
+    return led_kernel
+
+
+def get_scale(fuzziness):
+    # Fuzzier means neighbouring leds look more alike, so fewer lattice cells across the star
+    return 1 / max(fuzziness, 0.05)
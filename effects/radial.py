@@ -0,0 +1,19 @@
+"""Grows a circle from the center of the star"""
+from effects.falloff import sweep_kernel
+
+# relative: measure distances relative to the star size
+PARAMETERS = {"fuzziness": 1, "max_brightness": 0.1, "relative": True}
+LIGHTS_CENTER = True
+
+
+def get_blink_range(star_size):
+    return -0.5, star_size * 1.3  # For circles
+
+
+def get_coordinates(leds):
+    return [led.get_polar()[0] for led in leds]
+
+
+def precompute(leds, star_size, fuzziness, max_brightness, relative):
+    scale = star_size if relative else 1
+    return sweep_kernel(get_coordinates(leds), scale, fuzziness, max_brightness)
@@ -1,9 +1,16 @@
 import math
 import numpy as NP
+from clocksync import SyncClock, SyncMaster, SYNC_PORT
+from compositor import Compositor, get_effect_layers, get_group_masks
+import effects
 from star import Star
 from time import sleep, time
 
 MAX_BRIGHTNESS = 0.3
+# Play in lockstep with other stars: None to play on your own, "master" or "follower".
+# Start the master first, and point the followers to its address.
+SYNC_ROLE = None
+SYNC_MASTER = "192.168.1.10"
 
 # START OF SCRIPT
 # You don't have to change stuff below this point
@@ -99,25 +106,47 @@ def calculate_led_positions(star, r_big, r_small, r_center):
     leds.append(center_led)
     return leds
 
-def get_brightness(distance, fuzziness):
-    if fuzziness == 0:
-        corr_factor = 1000
-    else:
-        corr_factor = 1 / fuzziness
-    return round(1 - math.tanh(distance * corr_factor), 2)
+def prepare_effect(leds, mode, star_size, fuzziness):
+    # This script measures the distances in the same units as the star size (e.g. cm)
+    return effects.prepare(
+        mode,
+        leds,
+        star_size,
+        overrides=effects.ABSOLUTE_UNITS,
+        fuzziness=fuzziness,
+        max_brightness=MAX_BRIGHTNESS,
+    )
 
-def get_brightness_angle(ang1, ang2, fuzziness):
-    if fuzziness == 0:
-        corr_factor = 3 * 1000
+def get_blink_radius(frame, min_blink_radius, max_blink_radius, animation_speed, boomerang):
+    # The blink radius moves animation_speed every frame. Once it passes max_blink_radius
+    # it either starts over at min_blink_radius, or bounces back when boomerang is on.
+    # Computing it from the frame number means every star ends up at the same spot.
+    # A negative speed runs the same way, but from the max end.
+    if animation_speed == 0:
+        return min_blink_radius
+    step_size = abs(animation_speed)
+    last_step = math.floor((max_blink_radius - min_blink_radius) / step_size)
+    if boomerang:
+        # Up to one step past the max, back down to one step past the min, and up again
+        step = frame % (2 * last_step + 4)
+        if step > last_step + 1:
+            step = 2 * last_step + 2 - step
     else:
-        corr_factor = 3 * 1 / fuzziness
+        step = frame % (last_step + 1)
+    if animation_speed < 0:
+        return max_blink_radius - step * step_size
+    return min_blink_radius + step * step_size
 
-    dist = abs(ang1 - ang2)
-    dist = dist if dist < math.pi else 2 * math.pi - dist
-    return round(1 - math.tanh(dist * corr_factor), 2)
+def render_frame(compositor, effect, kernel, blink_radius, center_min_value):
+    # Some effects don't light up the center led, e.g. because it has no angle.
+    # The center always glows a little bit, which is pretty.
+    return compositor.flatten(
+        get_effect_layers(kernel(blink_radius), effect.LIGHTS_CENTER, center_min_value)
+    )
 
 def animate(
     leds,
+    compositor,
     mode,
     animation_speed,
     animation_fps,
@@ -127,78 +156,74 @@ def animate(
     center_min_value=0,
     boomerang=False
 ):
-        if mode == "radial":
-            min_blink_radius = -0.5  # For circles
-            max_blink_radius = star_size * 1.3
-        elif mode in ["x", "y"]:
-            min_blink_radius = -star_size * 1.5
-            max_blink_radius = star_size * 1.5
-        elif mode == "angular":
-            min_blink_radius = -math.pi  # -R*2
-            max_blink_radius = math.pi  # R*2
-            blink_radius = min_blink_radius
-        try:
-            t_end = time()
-            if seconds is not None:
-                t_end += seconds
-            while True:
-                if seconds is not None and time() > t_end:
-                    break
-
-                if boomerang:
-                    if blink_radius > max_blink_radius:
-                        animation_speed = -animation_speed
-                    if blink_radius < min_blink_radius:
-                        animation_speed = -animation_speed
-                else:
-                    if blink_radius > max_blink_radius:
-                        blink_radius = min_blink_radius
-
-                if mode == "radial":
-                    led_filter = [
-                        MAX_BRIGHTNESS
-                        * get_brightness(abs(led.get_polar()[0] - blink_radius), fuzziness)
-                        for led in leds
-                    ]
-                elif mode == "x":
-                    led_filter = [
-                        MAX_BRIGHTNESS
-                        * get_brightness(
-                            abs(led.get_cartesian()[0] - blink_radius), fuzziness
-                        )
-                        for led in leds
-                    ]
-                elif mode == "y":
-                    led_filter = [
-                        MAX_BRIGHTNESS
-                        * get_brightness(
-                            abs(led.get_cartesian()[1] - blink_radius), fuzziness
-                        )
-
-                    ]
-                elif mode == "angular":
-                    led_filter = [
-                        MAX_BRIGHTNESS
-                        * get_brightness_angle(led.get_polar()[1], blink_radius, fuzziness)
-                        for led in leds
-                    ]
-                    led_filter[-1] = center_min_value
-                else:
-                    raise ValueError(
-                        f"Mode '{mode}' not supported. Choose 'x', 'y', 'radial' or 'angular'"
-                    )
-
-                led_filter[-1] = max(led_filter[-1], center_min_value)
-                for idx, led in enumerate(leds):
-                    led.get_led().value = led_filter[idx]
-                sleep(1 / animation_fps)
-                blink_radius += animation_speed
-        except KeyboardInterrupt:
-            star.close()
+    # Look up the effect once, so every frame goes straight to its kernel
+    effect, kernel = prepare_effect(leds, mode, star_size, fuzziness)
+    min_blink_radius, max_blink_radius = effect.get_blink_range(star_size)
+    t_end = time()
+    if seconds is not None:
+        t_end += seconds
+    frame = 0
+    while True:
+        if seconds is not None and time() > t_end:
+            break
+
+        blink_radius = get_blink_radius(
+            frame, min_blink_radius, max_blink_radius, animation_speed, boomerang
+        )
+        led_filter = render_frame(compositor, effect, kernel, blink_radius, center_min_value)
+        for idx, led in enumerate(leds):
+            led.get_led().value = led_filter[idx]
+        sleep(1 / animation_fps)
+        frame += 1
+
+def play_synced(show, clock, compositor, animation_speed, animation_fps, star_size, fuzziness, center_min_value, boomerang):
+    """Plays the show on the shared clock, so every star shows the same frame at the same time
+    :param show: list of (mode, seconds, leds) tuples. Mode None means the star is off.
+    :param clock: SyncMaster or SyncClock
+    :param compositor: Compositor with the groups of the star
+    """
+    show_length = sum(seconds for _, seconds, _ in show)
+    # Look up the effects once, so every frame goes straight to their kernels
+    kernels = [
+        prepare_effect(leds, mode, star_size, fuzziness) if mode is not None else (None, None)
+        for mode, _, leds in show
+    ]
+    while not clock.is_synced():
+        sleep(0.1)
+
+    while True:
+        # Find out where we are in the show
+        show_time = clock.show_time() % show_length
+        for (mode, seconds, leds), (effect, kernel) in zip(show, kernels):
+            if show_time < seconds:
+                break
+            show_time -= seconds
+
+        frame = int(show_time * animation_fps)
+        if mode is None:
+            led_filter = [0] * len(leds)
+        else:
+            min_blink_radius, max_blink_radius = effect.get_blink_range(star_size)
+            blink_radius = get_blink_radius(
+                frame, min_blink_radius, max_blink_radius, animation_speed, boomerang
+            )
+            led_filter = render_frame(compositor, effect, kernel, blink_radius, center_min_value)
+        for idx, led in enumerate(leds):
+            led.get_led().value = led_filter[idx]
+
+        # Sleep until the next frame is due
+        sleep(max(0, (frame + 1) / animation_fps - show_time))
 
 if __name__ == "__main__":
     star = Star(pwm=True)
     R_BIG = 5  # Radius of the star towards the outer points (e.g. 5 cm)
+    FUZZINESS = 0.7
+    BOOMERANG = False
+    ANIMATION_SPEED = 0.6
+    CENTER_MIN_VALUE = 0.05
+    ANIMATION_FPS = 30
+
+    show = []
     seconds = [6, 7, 3, 4, 12]
     for idx, mode in enumerate(["x", "y", "x", "radial", "angular"]):
         if mode == "radial":
@@ -209,25 +234,51 @@ if __name__ == "__main__":
         R_CENTER = (
             R_SMALL - (R_BIG - R_SMALL) / 10
         )  # Perceived radius of the center led circle for radial animations
-        FUZZINESS = 0.7
-        BOOMERANG = False
-        ANIMATION_SPEED = 0.6
-        CENTER_MIN_VALUE = 0.05
-        ANIMATION_FPS = 30
 
         leds_list = calculate_led_positions(star, R_BIG, R_SMALL, R_CENTER)
-        animate(
-            leds_list,
-            mode,
-            ANIMATION_SPEED,
-            ANIMATION_FPS,
-            R_BIG,
-            fuzziness=FUZZINESS,
-            seconds=seconds[idx],
-            center_min_value=CENTER_MIN_VALUE,
-            boomerang=BOOMERANG,
-        )
+        show.append((mode, seconds[idx], leds_list))
         if mode == 'x' and idx == 2:
-            star.off()
-            sleep(1)
-    star.off()
\ No newline at end of file
+            # Take a short break
+            show.append((None, 1, leds_list))
+
+    # Every leds list has the leds in the same order, so they can share the compositor
+    compositor = Compositor(get_group_masks(star, show[0][2]))
+    try:
+        if SYNC_ROLE is None:
+            for mode, duration, leds_list in show:
+                if mode is None:
+                    star.off()
+                    sleep(duration)
+                    continue
+                animate(
+                    leds_list,
+                    compositor,
+                    mode,
+                    ANIMATION_SPEED,
+                    ANIMATION_FPS,
+                    R_BIG,
+                    fuzziness=FUZZINESS,
+                    seconds=duration,
+                    center_min_value=CENTER_MIN_VALUE,
+                    boomerang=BOOMERANG,
+                )
+        else:
+            # Loop the show forever, in lockstep with the other stars
+            if SYNC_ROLE == "master":
+                clock = SyncMaster(port=SYNC_PORT).start()
+            else:
+                clock = SyncClock(SYNC_MASTER, port=SYNC_PORT).start()
+            play_synced(
+                show,
+                clock,
+                compositor,
+                ANIMATION_SPEED,
+                ANIMATION_FPS,
+                R_BIG,
+                FUZZINESS,
+                CENTER_MIN_VALUE,
+                BOOMERANG,
+            )
+        star.off()
+    except KeyboardInterrupt:
+        star.close()
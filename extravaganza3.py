@@ -1,5 +1,7 @@
 import math
 import numpy as NP
+from compositor import Compositor, get_effect_layers, get_group_masks
+import effects
 from star import Star
 from time import sleep, time
 
@@ -99,25 +101,9 @@ def calculate_led_positions(star, r_big, r_small, r_center):
     leds.append(center_led)
     return leds
 
-def get_brightness(distance, fuzziness):
-    if fuzziness == 0:
-        corr_factor = 1000
-    else:
-        corr_factor = 1 / fuzziness
-    return round(1 - math.tanh(distance * corr_factor), 2)
-
-def get_brightness_angle(ang1, ang2, fuzziness):
-    if fuzziness == 0:
-        corr_factor = 3 * 1000
-    else:
-        corr_factor = 3 * 1 / fuzziness
-
-    dist = abs(ang1 - ang2)
-    dist = dist if dist < math.pi else 2 * math.pi - dist
-    return round(1 - math.tanh(dist * corr_factor), 2)
-
 def animate(
     leds,
+    compositor,
     mode,
     animation_speed,
     animation_fps,
@@ -127,16 +113,18 @@ def animate(
     center_min_value=0,
     boomerang=False):
 
-    if mode == "radial":
-        min_blink_radius = -0.5  # For circles
-        max_blink_radius = star_size * 1.3
-    elif mode in ["x", "y"]:
-        min_blink_radius = -star_size * 1.5
-        max_blink_radius = star_size * 1.5
-    elif mode == "angular":
-        min_blink_radius = -math.pi  # -R*2
-        max_blink_radius = math.pi  # R*2
-        blink_radius = min_blink_radius
+    # Look up the effect once, so every frame goes straight to its kernel.
+    # Distances are in the same units as the star size (e.g. cm).
+    effect, kernel = effects.prepare(
+        mode,
+        leds,
+        star_size,
+        overrides=effects.ABSOLUTE_UNITS,
+        fuzziness=fuzziness,
+        max_brightness=MAX_BRIGHTNESS,
+    )
+    min_blink_radius, max_blink_radius = effect.get_blink_range(star_size)
+    blink_radius = min_blink_radius
     try:
         t_end = time()
         if seconds is not None:
@@ -154,40 +142,9 @@ def animate(
                 if blink_radius > max_blink_radius:
                     blink_radius = min_blink_radius
 
-            if mode == "radial":
-                led_filter = [
-                    MAX_BRIGHTNESS
-                    * get_brightness(abs(led.get_polar()[0] - blink_radius), fuzziness)
-                    for led in leds
-                ]
-            elif mode == "x":
-                led_filter = [
-                    MAX_BRIGHTNESS
-                    * get_brightness(
-                        abs(led.get_cartesian()[0] - blink_radius), fuzziness
-                    )
-                    for led in leds
-                ]
-            elif mode == "y":
-                led_filter = [
-                    MAX_BRIGHTNESS
-                    * get_brightness(
-                        abs(led.get_cartesian()[1] - blink_radius), fuzziness
-                    )
-                ]
-            elif mode == "angular":
-                led_filter = [
-                    MAX_BRIGHTNESS
-                    * get_brightness_angle(led.get_polar()[1], blink_radius, fuzziness)
-                    for led in leds
-                ]
-                led_filter[-1] = center_min_value
-            else:
-                raise ValueError(
-                    f"Mode '{mode}' not supported. Choose 'x', 'y', 'radial' or 'angular'"
-                )
-
-            led_filter[-1] = max(led_filter[-1], center_min_value)
+            led_filter = compositor.flatten(
+                get_effect_layers(kernel(blink_radius), effect.LIGHTS_CENTER, center_min_value)
+            )
             for idx, led in enumerate(leds):
                 led.get_led().value = led_filter[idx]
             sleep(1 / animation_fps)
@@ -215,8 +172,10 @@ if __name__ == "__main__":
         ANIMATION_FPS = 30
 
         leds_list = calculate_led_positions(star, R_BIG, R_SMALL, R_CENTER)
+        compositor = Compositor(get_group_masks(star, leds_list))
         animate(
             leds_list,
+            compositor,
             mode,
             ANIMATION_SPEED,
             ANIMATION_FPS,
@@ -0,0 +1,200 @@
+"""
+A live mirror of the star in your browser.
+Start a StarMirror next to your animation and call publish() with every frame you send to
+the leds. Then point a browser to http://<your pi>:8026 to see the star light up.
+
+The frames are streamed to the browser with Server-Sent Events. Every browser gets its own
+thread, which only sends the leds that changed since the last frame it got, and never more
+than max_fps frames per second. A slow browser simply skips the frames it couldn't keep up
+with, so publish() never has to wait for anyone and the animation keeps running smoothly.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import sleep, time
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>rpistar</title>
+<style>
+  body { background: #111; color: #888; font-family: sans-serif; text-align: center; }
+  canvas { margin-top: 2em; }
+</style>
+</head>
+<body>
+<canvas id="star" width="480" height="480"></canvas>
+<p id="status">connecting...</p>
+<script>
+const positions = %(positions)s;
+const canvas = document.getElementById("star");
+const ctx = canvas.getContext("2d");
+const status = document.getElementById("status");
+const values = new Array(positions.length).fill(0);
+
+function draw() {
+  ctx.fillStyle = "#111";
+  ctx.fillRect(0, 0, canvas.width, canvas.height);
+  positions.forEach(function (pos, idx) {
+    // The leds are pretty dim, so boost the low values a bit
+    const brightness = Math.sqrt(values[idx] / 255);
+    const x = canvas.width / 2 + pos[0] * canvas.width * 0.4;
+    const y = canvas.height / 2 - pos[1] * canvas.height * 0.4;
+    ctx.beginPath();
+    ctx.arc(x, y, 10, 0, 2 * Math.PI);
+    ctx.fillStyle = "rgba(255, 200, 80, " + Math.max(brightness, 0.05) + ")";
+    ctx.fill();
+  });
+}
+
+const source = new EventSource("/stream");
+source.onopen = function () { status.textContent = "live"; };
+source.onerror = function () { status.textContent = "reconnecting..."; };
+source.onmessage = function (event) {
+  const frame = JSON.parse(event.data);
+  frame.d.forEach(function (change) { values[change[0]] = change[1]; });
+  draw();
+};
+draw();
+</script>
+</body>
+</html>
+"""
+
+
+def quantize(led_filter):
+    # Brightness between 0 and 1 to an integer between 0 and 255, which keeps the messages small
+    return [min(255, max(0, int(round(value * 255)))) for value in led_filter]
+
+
+class StarMirror:
+    def __init__(self, leds, host="127.0.0.1", port=8026, max_fps=10):
+        """
+        :param leds: list of Led objects as returned by calculate_led_positions
+        :param host: address to listen on, use "0.0.0.0" to allow other computers to watch
+        :param port: port to listen on, use 0 to pick a free one
+        :param max_fps: maximum number of frames per second sent to every browser
+        """
+        positions = [led.get_cartesian() for led in leds]
+        # Scale the positions so the star fits between -1 and 1
+        size = max(max(abs(pos[0]), abs(pos[1])) for pos in positions) or 1
+        self.positions = [[pos[0] / size, pos[1] / size] for pos in positions]
+        self.host = host
+        self.port = port
+        self.max_fps = max_fps
+        self.frame = None
+        self.frame_no = 0
+        self.running = False
+        self.condition = threading.Condition()
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        # Every mirror gets its own handler class, so the handler knows where to get its frames
+        Handler = type("Handler", (MirrorRequestHandler,), {"mirror": self})
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.running = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        with self.condition:
+            self.condition.notify_all()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def publish(self, led_filter):
+        """Hands a new frame to the browsers. This never waits for the network.
+        :param led_filter: list of brightness values, one for each led
+        """
+        with self.condition:
+            self.frame = tuple(led_filter)
+            self.frame_no += 1
+            self.condition.notify_all()
+
+    def wait_for_frame(self, last_frame_no, timeout):
+        with self.condition:
+            self.condition.wait_for(
+                lambda: self.frame_no != last_frame_no or not self.running, timeout
+            )
+            return self.frame_no, self.frame
+
+
+class MirrorRequestHandler(BaseHTTPRequestHandler):
+    mirror = None
+    # Drop browsers that stop reading altogether
+    timeout = 30
+
+    def do_GET(self):
+        if self.path == "/":
+            self.send_body(
+                "text/html", PAGE % {"positions": json.dumps(self.mirror.positions)}
+            )
+        elif self.path == "/leds":
+            self.send_body("application/json", json.dumps(self.mirror.positions))
+        elif self.path == "/stream":
+            self.stream()
+        else:
+            self.send_error(404)
+
+    def send_body(self, content_type, body):
+        body = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        mirror = self.mirror
+        frame_no = 0
+        shown = None
+        try:
+            while mirror.running:
+                t_start = time()
+                new_frame_no, frame = mirror.wait_for_frame(frame_no, timeout=15)
+                if new_frame_no == frame_no or frame is None:
+                    # Nothing happened for a while, let the browser know we're still here
+                    self.wfile.write(b": ping\n\n")
+                    self.wfile.flush()
+                    continue
+                frame_no = new_frame_no
+
+                # Only send the leds that changed since the last frame this browser got
+                values = quantize(frame)
+                if shown is None or len(shown) != len(values):
+                    changes = list(enumerate(values))
+                else:
+                    changes = [
+                        (idx, value)
+                        for idx, (value, old) in enumerate(zip(values, shown))
+                        if value != old
+                    ]
+                shown = values
+                if changes:
+                    message = json.dumps({"n": frame_no, "d": changes}, separators=(",", ":"))
+                    self.wfile.write(f"data: {message}\n\n".encode())
+                    self.wfile.flush()
+
+                # Don't send more than max_fps frames. Anything published in the meantime
+                # is merged into the next delta.
+                remaining = 1 / mirror.max_fps - (time() - t_start)
+                if remaining > 0:
+                    sleep(remaining)
+        except (BrokenPipeError, ConnectionResetError, TimeoutError):
+            pass
+
+    def log_message(self, format, *args):
+        # Keep the console clean, the animation may be printing stuff as well
+        pass
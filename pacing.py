@@ -0,0 +1,70 @@
+"""
+Frame pacing for the star animations.
+Most of the time a lot of the frames we render are identical, e.g. when the sweep is
+somewhere off the star or when the star just shows a static image. There's no point in
+pushing those to the leds 30 times a second, so the FramePacer keeps track of what is
+currently shown on the star and backs off the frame rate while nothing changes.
+As soon as the output changes again it jumps straight back to the full frame rate.
+"""
+from time import sleep
+
+
+class FramePacer:
+    def __init__(self, fps, max_skip=None, tolerance=0.0005):
+        """
+        :param fps: the nominal frame rate of the animation
+        :param max_skip: the maximum number of frames to sleep when nothing changes (default: 1 second)
+        :param tolerance: brightness changes up to this are not worth a redraw. The default is half of
+                          the smallest step the effects make at a max brightness of 0.1.
+        """
+        self.fps = fps
+        self.max_skip = max_skip if max_skip is not None else max(1, int(fps))
+        self.tolerance = tolerance
+        self.skip = 1
+        self.shown = None
+
+    def differs(self, frame):
+        """Checks a rendered frame against what's currently on the star
+        :param frame: list of brightness values, one for each led
+        :return: True if any led changed more than the tolerance
+        """
+        if self.shown is None or len(self.shown) != len(frame):
+            return True
+        return any(abs(new - old) > self.tolerance for new, old in zip(frame, self.shown))
+
+    def submit(self, frame):
+        """Keeps track of what's on the star
+        :param frame: list of brightness values, one for each led
+        :return: True if the frame should be written to the leds
+        """
+        changed = self.differs(frame)
+        if changed:
+            # Motion! Back to the full frame rate
+            self.shown = list(frame)
+            self.skip = 1
+        else:
+            # Compare against the frame that is actually shown, so slow fades
+            # still get written once they've drifted far enough.
+            self.skip = min(self.skip * 2, self.max_skip)
+        return changed
+
+    def wait(self, frames_until_change=None, frames_left=None):
+        """Sleeps until the next frame that is worth rendering
+        :param frames_until_change: number of frames until the caller knows the output will change
+        :param frames_left: number of frames until the animation ends
+        :return: the number of frames that were slept, so the caller can advance the animation
+        """
+        if frames_until_change is not None:
+            # The caller knows exactly when something is going to happen, so sleep until then
+            # and be ready for motion when it does
+            frames = frames_until_change
+            self.skip = 1
+        else:
+            # Otherwise sleep longer and longer while nothing changes. Only use this when
+            # nothing can happen in between, or it will be missed.
+            frames = self.skip
+        if frames_left is not None:
+            frames = min(frames, frames_left)
+        frames = max(1, int(frames))
+        sleep(frames / self.fps)
+        return frames
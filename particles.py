@@ -0,0 +1,323 @@
+"""
+A particle engine for the star: sparks, falling snow and fireworks.
+Particles fly around in the same x,y space as the leds from calculate_led_positions.
+Every frame each particle lights up the leds around it, with the same tanh falloff as
+the effects (see effects/falloff.py), and fades out as it gets older.
+
+All particles live in numpy arrays with a fixed capacity that are allocated once.
+Dead particles go back on a free list, so new ones can reuse their slot. The frame itself
+is computed in place in preallocated buffers as well, so apart from some bookkeeping when
+particles die nothing gets allocated per frame, and a Pi 3 can keep up with thousands of
+particles at 30-60 FPS.
+"""
+import math
+import numpy as NP
+from time import sleep, time
+
+
+class ParticleSystem:
+    def __init__(self, leds, capacity=2048, fuzziness=0.1, gravity=0.0, drag=0.0, seed=None):
+        """
+        :param leds: list of Led objects as returned by calculate_led_positions
+        :param capacity: maximum number of particles alive at the same time
+        :param fuzziness: how far the light of a particle reaches, relative to the star size
+        :param gravity: acceleration in the y direction (negative is down), relative to the star size
+        :param drag: fraction of the speed the particles lose every second
+        """
+        self.led_x = NP.array([led.get_cartesian()[0] for led in leds], dtype=float)
+        self.led_y = NP.array([led.get_cartesian()[1] for led in leds], dtype=float)
+        self.star_size = float(NP.max(NP.hypot(self.led_x, self.led_y))) or 1.0
+        self.capacity = capacity
+        self.fuzziness = fuzziness
+        self.gravity = gravity * self.star_size
+        self.drag = drag
+        self.rng = NP.random.default_rng(seed)
+
+        # The particles
+        self.x = NP.zeros(capacity)
+        self.y = NP.zeros(capacity)
+        self.vx = NP.zeros(capacity)
+        self.vy = NP.zeros(capacity)
+        self.life = NP.zeros(capacity)
+        self.lifetime = NP.ones(capacity)
+        self.brightness = NP.zeros(capacity)
+        self.alive = NP.zeros(capacity, dtype=bool)
+
+        # Stack of free slots. The lowest slots go on top, so the particles stay packed at the start.
+        self.free = NP.arange(capacity)[::-1].copy()
+        self.free_count = capacity
+        # Every slot above this one is free, so we don't have to look at them
+        self.high_water = 0
+
+        # Scratch space, so nothing needs to be allocated while animating
+        self.slots = NP.arange(capacity)
+        self.dead = NP.zeros(capacity, dtype=bool)
+        self.weight = NP.zeros(capacity)
+        self.scratch = NP.zeros((3, capacity))
+        self.distance = NP.zeros((capacity, len(leds)))
+        self.distance_y = NP.zeros((capacity, len(leds)))
+        # The led positions repeated for every particle. Broadcasting them on the fly would
+        # make numpy allocate buffers every frame.
+        self.led_grid_x = NP.tile(self.led_x, (capacity, 1))
+        self.led_grid_y = NP.tile(self.led_y, (capacity, 1))
+        self.frame = NP.zeros(len(leds))
+
+    def count(self):
+        return self.capacity - self.free_count
+
+    def random(self, count, row=0):
+        """Fills a row of the scratch space with random numbers between 0 and 1
+        :return: a view on the first count numbers
+        """
+        values = self.scratch[row, :count]
+        self.rng.random(out=values)
+        return values
+
+    def emit(self, count, lifetime, brightness=1.0):
+        """Claims slots for new particles. The caller sets their position and speed.
+        :param count: number of particles, fewer are emitted when the system is full
+        :param lifetime: number of seconds the particles live
+        :param brightness: brightness of the particles when they're born
+        :return: the slots of the new particles
+        """
+        count = min(count, self.free_count)
+        slots = self.free[self.free_count - count:self.free_count]
+        self.free_count -= count
+        if count == 0:
+            return slots
+
+        self.alive[slots] = True
+        self.life[slots] = lifetime
+        self.lifetime[slots] = lifetime
+        self.brightness[slots] = brightness
+        self.vx[slots] = 0
+        self.vy[slots] = 0
+        self.high_water = max(self.high_water, int(slots.max()) + 1)
+        return slots
+
+    def step(self, dt):
+        """Moves all particles forward in time
+        :param dt: seconds since the last step
+        """
+        n = self.high_water
+        if n == 0:
+            return
+        x, y, vx, vy = self.x[:n], self.y[:n], self.vx[:n], self.vy[:n]
+        life, alive, dead = self.life[:n], self.alive[:n], self.dead[:n]
+        tmp = self.scratch[0, :n]
+
+        vy += self.gravity * dt
+        if self.drag:
+            slow_down = max(0.0, 1 - self.drag * dt)
+            vx *= slow_down
+            vy *= slow_down
+        NP.multiply(vx, dt, out=tmp)
+        x += tmp
+        NP.multiply(vy, dt, out=tmp)
+        y += tmp
+        life -= dt
+
+        # Put the particles that just died back on the free list, the lowest slot on top
+        NP.less_equal(life, 0, out=dead)
+        NP.logical_and(dead, alive, out=dead)
+        deaths = int(NP.count_nonzero(dead))
+        if deaths:
+            NP.compress(dead, self.slots[:n], out=self.free[self.free_count:self.free_count + deaths][::-1])
+            self.free_count += deaths
+            NP.logical_xor(alive, dead, out=alive)
+            if self.free_count == self.capacity:
+                self.high_water = 0
+            else:
+                # Right after the last particle that's still alive
+                self.high_water = n - int(NP.argmax(alive[::-1]))
+
+    def render(self):
+        """Splats all particles onto the leds
+        :return: brightness of every led between 0 and 1. This is a buffer that's reused every frame.
+        """
+        n = self.high_water
+        if n == 0:
+            self.frame.fill(0)
+            return self.frame
+
+        # Particles fade out as they get older, dead ones don't count at all
+        weight = self.weight[:n]
+        NP.divide(self.life[:n], self.lifetime[:n], out=weight)
+        NP.maximum(weight, 0, out=weight)
+        weight *= self.brightness[:n]
+
+        # Distance from every particle to every led, and from there the brightness like the effects
+        distance, distance_y = self.distance[:n], self.distance_y[:n]
+        NP.copyto(distance, self.x[:n, NP.newaxis])
+        distance -= self.led_grid_x[:n]
+        NP.copyto(distance_y, self.y[:n, NP.newaxis])
+        distance_y -= self.led_grid_y[:n]
+        NP.hypot(distance, distance_y, out=distance)
+        distance *= 1 / (max(self.fuzziness, 0.001) * self.star_size)
+        NP.tanh(distance, out=distance)
+        NP.subtract(1, distance, out=distance)
+
+        # Add up the light of all particles
+        NP.dot(weight, distance, out=self.frame)
+        NP.minimum(self.frame, 1, out=self.frame)
+        return self.frame
+
+
+def get_tips(system):
+    # The leds on the outer points of the star
+    radius = NP.hypot(system.led_x, system.led_y)
+    tips = radius > 0.99 * radius.max()
+    return list(zip(system.led_x[tips], system.led_y[tips]))
+
+
+class Sparks:
+    # Short-lived sparks that jump off random spots on the star
+    def __init__(self, rate=40, speed=0.5, lifetime=0.4):
+        self.rate = rate
+        self.speed = speed
+        self.lifetime = lifetime
+        self.carry = 0.0
+
+    def update(self, system, dt):
+        self.carry += self.rate * dt
+        count = int(self.carry)
+        self.carry -= count
+        slots = system.emit(count, self.lifetime)
+        count = len(slots)
+        if count == 0:
+            return
+        # Start somewhere inside the star, and fly off in a random direction
+        radius = system.random(count, 0)
+        radius *= system.star_size
+        angle = system.random(count, 1)
+        angle *= 2 * math.pi
+        direction = system.scratch[2, :count]
+        NP.cos(angle, out=direction)
+        system.x[slots] = NP.multiply(radius, direction, out=direction)
+        NP.sin(angle, out=direction)
+        system.y[slots] = NP.multiply(radius, direction, out=direction)
+        angle = system.random(count, 1)
+        angle *= 2 * math.pi
+        NP.cos(angle, out=direction)
+        system.vx[slots] = NP.multiply(direction, self.speed * system.star_size, out=direction)
+        NP.sin(angle, out=direction)
+        system.vy[slots] = NP.multiply(direction, self.speed * system.star_size, out=direction)
+
+
+class Snow:
+    # Snow flakes that slowly fall down over the star
+    def __init__(self, rate=6, speed=0.3, wobble=0.1):
+        self.rate = rate
+        self.speed = speed
+        self.wobble = wobble
+        self.carry = 0.0
+
+    def update(self, system, dt):
+        self.carry += self.rate * dt
+        count = int(self.carry)
+        self.carry -= count
+        # Live long enough to fall all the way through the star
+        lifetime = 2.4 / self.speed
+        slots = system.emit(count, lifetime)
+        count = len(slots)
+        if count == 0:
+            return
+        size = system.star_size
+        values = system.random(count, 0)
+        values -= 0.5
+        values *= 2 * size
+        system.x[slots] = values
+        system.y[slots] = 1.2 * size
+        values = system.random(count, 0)
+        values -= 0.5
+        values *= 2 * self.wobble * size
+        system.vx[slots] = values
+        system.vy[slots] = -self.speed * size
+
+
+class Fireworks:
+    # Every now and then a burst of particles shoots out of one of the tips
+    def __init__(self, interval=1.5, particles=200, speed=1.0, lifetime=1.2):
+        self.interval = interval
+        self.particles = particles
+        self.speed = speed
+        self.lifetime = lifetime
+        self.countdown = 0.0
+        self.tips = None
+
+    def update(self, system, dt):
+        if self.tips is None:
+            self.tips = get_tips(system)
+        self.countdown -= dt
+        if self.countdown > 0:
+            return
+        self.countdown += self.interval
+
+        slots = system.emit(self.particles, self.lifetime)
+        count = len(slots)
+        if count == 0:
+            return
+        tip_x, tip_y = self.tips[int(system.rng.random() * len(self.tips))]
+        system.x[slots] = tip_x
+        system.y[slots] = tip_y
+        # Random directions, and random speeds so the burst fills up
+        angle = system.random(count, 0)
+        angle *= 2 * math.pi
+        speed = system.random(count, 1)
+        speed *= self.speed * system.star_size
+        direction = system.scratch[2, :count]
+        NP.cos(angle, out=direction)
+        system.vx[slots] = NP.multiply(direction, speed, out=direction)
+        NP.sin(angle, out=direction)
+        system.vy[slots] = NP.multiply(direction, speed, out=direction)
+
+
+def animate_particles(leds, system, effect, animation_fps, max_brightness=0.3, seconds=None):
+    """Runs a particle effect on the star
+    :param leds: list of Led objects as returned by calculate_led_positions
+    :param system: ParticleSystem built from the same leds
+    :param effect: Sparks, Snow, Fireworks or anything else with an update(system, dt) method
+    """
+    t_end = time()
+    if seconds is not None:
+        t_end += seconds
+    dt = 1 / animation_fps
+    while True:
+        if seconds is not None and time() > t_end:
+            break
+        effect.update(system, dt)
+        system.step(dt)
+        led_filter = system.render()
+        for idx, led in enumerate(leds):
+            led.get_led().value = max_brightness * float(led_filter[idx])
+        sleep(dt)
+
+
+if __name__ == "__main__":
+    from extravaganza import calculate_led_positions
+    from star import Star
+
+    EFFECT = "fireworks"    # can be "sparks", "snow" or "fireworks"
+    ANIMATION_FPS = 60
+    star = Star(pwm=True)
+    R_BIG = 5
+    R_SMALL = 4
+    R_CENTER = R_SMALL - (R_BIG - R_SMALL) / 10
+    leds_list = calculate_led_positions(star, R_BIG, R_SMALL, R_CENTER)
+
+    if EFFECT == "sparks":
+        system = ParticleSystem(leds_list, fuzziness=0.15)
+        effect = Sparks()
+    elif EFFECT == "snow":
+        system = ParticleSystem(leds_list, fuzziness=0.2)
+        effect = Snow()
+    elif EFFECT == "fireworks":
+        system = ParticleSystem(leds_list, fuzziness=0.1, gravity=-0.8, drag=0.5)
+        effect = Fireworks()
+    else:
+        raise ValueError(f"Effect '{EFFECT}' not supported. Choose 'sparks', 'snow' or 'fireworks'")
+
+    try:
+        animate_particles(leds_list, system, effect, ANIMATION_FPS)
+    except KeyboardInterrupt:
+        star.close()
@@ -6,10 +6,16 @@ It works as follows:
  - It then creates an animation by highlighting LED's at a certain coordinate (e.g. x=0)
 """
 import math
-from time import sleep, time
+from time import time
 from gpiozero import LEDBoard
+import effects
+from effects.falloff import get_corr_factor
+from compositor import Compositor, get_effect_layers, get_group_masks
+from mirror import StarMirror
+from pacing import FramePacer
 
 # I've defined four modes of operation: loop over the x-axis, the y-axis, radially or in an angular motion.
+# Any other effect in effects.EFFECTS works too, e.g. "flicker", "flames" or "aurora".
 MODE = "x"              # can be "x", "y", "x", "radial", "angular"
 MAX_BRIGHTNESS = 0.1    # maximum brightness of the LED's (between 0 and 1)
 CENTER_MIN_BRIGHTNESS = 0.05 # How much the center circle leds should light up at minimum, which can be pretty
@@ -18,6 +24,7 @@ BOOMERANG = True        # Should the animation have a boomerang effect
 ANIMATION_SPEED = 0.2   # How fast the animation should run. Recommended is to change this value and keep FPS fixed.
 DURATION_IN_SECONDS = 10 # How long should the animation run (use None) to loop indefinitely
 ANIMATION_FPS = 30      # Nice framerate
+MIRROR_PORT = None      # Set to e.g. 8026 to watch the star live in your browser at http://<your pi>:8026
 
 
 # START OF SCRIPT
@@ -164,19 +171,71 @@ def calculate_led_positions(star, r_big, r_small, r_center):
     return leds
 
 
-def get_brightness(distance, fuzziness):
-    if fuzziness == 0:
-        corr_factor = 1000
+def get_reach(fuzziness):
+    # The distance at which the falloff of the effects has rounded down to 0 (with some margin to spare)
+    return math.atanh(0.999) / get_corr_factor(fuzziness)
+
+
+def step_coordinate(blink_coordinate, animation_speed, min_blink_coordinate, max_blink_coordinate, boomerang):
+    blink_coordinate += animation_speed
+    # Just turn BOOMERANG on and you see what it means :)
+    if boomerang:
+        if blink_coordinate > max_blink_coordinate:
+            animation_speed = -animation_speed
+        if blink_coordinate < min_blink_coordinate:
+            animation_speed = -animation_speed
     else:
-        corr_factor = 1 / fuzziness
-    return round(1 - math.tanh(distance * corr_factor), 2)
+        if blink_coordinate > max_blink_coordinate:
+            blink_coordinate = min_blink_coordinate
+    return blink_coordinate, animation_speed
 
 
-def get_brightness_angle(ang1, ang2, led_radius, fuzziness):
-    dist = abs(ang1 - ang2)
-    dist = dist if dist < math.pi else 2 * math.pi - dist
-    dist = math.sin(dist) * led_radius
-    return get_brightness(dist, fuzziness)
+def frames_until_on_star(
+    blink_coordinate,
+    animation_speed,
+    min_blink_coordinate,
+    max_blink_coordinate,
+    boomerang,
+    star_extent,
+    max_frames,
+):
+    """Counts the frames until the sweep gets close enough to a led to light it up
+    :param star_extent: [lowest, highest] coordinate where the sweep still lights up a led
+    :param max_frames: stop counting after this many frames
+    :return: number of frames, 0 if the sweep is on the star right now
+    """
+    frames = 0
+    while frames < max_frames and not (star_extent[0] <= blink_coordinate <= star_extent[1]):
+        blink_coordinate, animation_speed = step_coordinate(
+            blink_coordinate, animation_speed, min_blink_coordinate, max_blink_coordinate, boomerang
+        )
+        frames += 1
+    return frames
+
+
+def frames_until_different(
+    render,
+    pacer,
+    blink_coordinate,
+    animation_speed,
+    min_blink_coordinate,
+    max_blink_coordinate,
+    boomerang,
+    max_frames,
+):
+    """Renders ahead to find the first frame that's different from what's on the star
+    :param render: function that renders the frame at a blink coordinate
+    :param pacer: the FramePacer that knows what's on the star
+    :param max_frames: stop looking after this many frames
+    :return: number of frames until the first different frame, or None if there's none in max_frames
+    """
+    for frames in range(1, max_frames):
+        blink_coordinate, animation_speed = step_coordinate(
+            blink_coordinate, animation_speed, min_blink_coordinate, max_blink_coordinate, boomerang
+        )
+        if pacer.differs(render(blink_coordinate)):
+            return frames
+    return None
 
 
 def animate(
@@ -190,20 +249,32 @@ def animate(
     seconds=None,
     center_min_value=0,
     boomerang=False,
+    mirror=None,
 ):
-    if mode == "radial":
-        min_blink_coordinate = -0.5  # For circles
-        max_blink_radius = star_size * 1.3
-    elif mode in ["x", "y"]:
-        min_blink_coordinate = -star_size * 1.5
-        max_blink_radius = star_size * 1.5
-    elif mode == "angular":
-        min_blink_coordinate = -math.pi  # -R*2
-        max_blink_radius = math.pi  # R*2
+    # Look up the effect once, so every frame goes straight to its kernel
+    effect, kernel = effects.prepare(
+        mode, leds, star_size, fuzziness=fuzziness, max_brightness=MAX_BRIGHTNESS
+    )
+    min_blink_coordinate, max_blink_radius = effect.get_blink_range(star_size)
+    compositor = Compositor(get_group_masks(star, leds))
+
+    def render(coordinate):
+        return compositor.flatten(
+            get_effect_layers(kernel(coordinate), effect.LIGHTS_CENTER, center_min_value)
+        )
 
     # Start the blinking at the  first coordinate
     # This can be anywhere between min_blink_coordinate and max_blink_coordinate
     blink_coordinate = min_blink_coordinate
+
+    # When the sweep is off the star every frame is the same, so we can sleep until it comes back.
+    # For the angular mode the sweep is always somewhere on the star.
+    led_coordinates = effect.get_coordinates(leds)
+    if led_coordinates is not None:
+        reach = get_reach(fuzziness) * star_size
+        star_extent = [min(led_coordinates) - reach, max(led_coordinates) + reach]
+    # The effects round to 1% of the max brightness, so anything less than half of that isn't a change
+    pacer = FramePacer(animation_fps, tolerance=MAX_BRIGHTNESS * 0.005)
     try:
         # Set a specified end time when it is given
         t_end = time()
@@ -211,61 +282,52 @@ def animate(
             t_end += seconds
 
         while True:
-            if seconds is not None and time() > t_end:
-                break
-
-            # Just turn BOOMERANG on and you see what it means :)
-            if boomerang:
-                if blink_coordinate > max_blink_radius:
-                    animation_speed = -animation_speed
-                if blink_coordinate < min_blink_coordinate:
-                    animation_speed = -animation_speed
-            else:
-                if blink_coordinate > max_blink_radius:
-                    blink_coordinate = min_blink_coordinate
-
-            if mode == "radial":
-                led_filter = [
-                    MAX_BRIGHTNESS
-                    * get_brightness(abs(led.get_polar()[0] - blink_coordinate)/star_size, fuzziness)
-                    for led in leds
-                ]
-            elif mode == "x":
-                led_filter = [
-                    MAX_BRIGHTNESS
-                    * get_brightness(
-                        abs(led.get_cartesian()[0] - blink_coordinate)/star_size, fuzziness
-                    )
-                    for led in leds
-                ]
-            elif mode == "y":
-                led_filter = [
-                    MAX_BRIGHTNESS
-                    * get_brightness(
-                        abs(led.get_cartesian()[1] - blink_coordinate)/star_size, fuzziness
-                    )
-                    for led in leds
-                ]
-            elif mode == "angular":
-                led_filter = [
-                    MAX_BRIGHTNESS
-                    * get_brightness_angle(led.get_polar()[1]/star_size, blink_coordinate, led.get_polar()[0], fuzziness)
-                    for led in leds
-                ]
-                led_filter[-1] = center_min_value
-            else:
-                raise ValueError(
-                    f"Mode '{mode}' not supported. Choose 'x', 'y', 'radial' or 'angular'"
-                )
+            frames_left = None
+            if seconds is not None:
+                if time() > t_end:
+                    break
+                frames_left = math.ceil((t_end - time()) * animation_fps)
 
-            led_filter[-1] = max(led_filter[-1], center_min_value)
+            led_filter = render(blink_coordinate)
 
             # This important piece of code actually lights up the leds.
-            for idx, led in enumerate(leds):
-                led.get_led().value = led_filter[idx]
+            # Only bother when something actually changed.
+            if pacer.submit(led_filter):
+                for idx, led in enumerate(leds):
+                    led.get_led().value = led_filter[idx]
+                if mirror is not None:
+                    mirror.publish(led_filter)
+
+            if led_coordinates is not None:
+                # Off the star nothing changes until the sweep comes back, so sleep until then.
+                # On the star the sweep can cross a led on any frame.
+                frames_until_change = max(1, frames_until_on_star(
+                    blink_coordinate,
+                    animation_speed,
+                    min_blink_coordinate,
+                    max_blink_radius,
+                    boomerang,
+                    star_extent,
+                    max_frames=frames_left if frames_left is not None else 60 * animation_fps,
+                ))
+            else:
+                # Otherwise look ahead for the next change, but no further than the pacer would
+                # sleep anyway. If there is none, the pacer can safely back off a bit more.
+                frames_until_change = frames_until_different(
+                    render,
+                    pacer,
+                    blink_coordinate,
+                    animation_speed,
+                    min_blink_coordinate,
+                    max_blink_radius,
+                    boomerang,
+                    max_frames=pacer.skip,
+                )
 
-            sleep(1 / animation_fps)
-            blink_coordinate += animation_speed
+            for _ in range(pacer.wait(frames_until_change, frames_left)):
+                blink_coordinate, animation_speed = step_coordinate(
+                    blink_coordinate, animation_speed, min_blink_coordinate, max_blink_radius, boomerang
+                )
     except KeyboardInterrupt:
         star.close()
 
@@ -295,6 +357,12 @@ if __name__ == "__main__":
 
     # Calculate the x,y coordinates of the led's on the star
     leds_list = calculate_led_positions(STAR, R_BIG, R_SMALL, R_CENTER)
+
+    # Optionally show what the star is doing in the browser
+    MIRROR = None
+    if MIRROR_PORT is not None:
+        MIRROR = StarMirror(leds_list, host="0.0.0.0", port=MIRROR_PORT).start()
+
     animate(
         star=STAR,
         leds=leds_list,
@@ -306,6 +374,10 @@ if __name__ == "__main__":
         seconds=DURATION_IN_SECONDS,
         center_min_value=CENTER_MIN_BRIGHTNESS,
         boomerang=BOOMERANG,
+        mirror=MIRROR,
     )
 
+    if MIRROR is not None:
+        MIRROR.stop()
+
     STAR.off()
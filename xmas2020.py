@@ -9,6 +9,8 @@ DAY_START_HOUR = 4  # partying until 4AM is allowed. After that, it's embarrassi
 BEER_HOUR = 16
 ON_BRIGHTNESS = 0.1
 try:
+    # The image only changes every so many minutes, so only redraw it when it did
+    shown = None
     leds = list(star.leds)
     # Rotate the list so the center of the star comes last
     leds.append(leds.pop(0))
@@ -19,6 +21,13 @@ try:
             # It's beer time!
             pulse_index = 25
             led_filter = [ON_BRIGHTNESS] * 26
+            # Nothing changes until the party's over. Localize the day itself, so the
+            # nights where daylight saving time changes don't throw us off by an hour.
+            party_day = now.date()
+            if now.hour > DAY_START_HOUR:
+                party_day += timedelta(days=1)
+            party_over = NL_TZ.localize(datetime(party_day.year, party_day.month, party_day.day, DAY_START_HOUR + 1))
+            seconds_until_change = (party_over - now).total_seconds()
         else:
             # No beer yet :(
             # Count hours until it's time
@@ -28,13 +37,19 @@ try:
             max_duration = BEER_HOUR * 3600.0
             pulse_index = int(25 - math.floor(duration_in_seconds / max_duration * 25.0))
             led_filter[0:pulse_index] = [ON_BRIGHTNESS] * (pulse_index + 1)
-        for idx, led in enumerate(leds):
-            led.value = led_filter[idx]
-            if idx == pulse_index:
-                led.pulse()
-            sleep(0.25)
-        sleep(60)
-        star.off()
-        sleep(2)
+            # The next led lights up once the remaining time drops below the next 1/25th
+            seconds_per_led = max_duration / 25.0
+            seconds_until_change = duration_in_seconds - math.floor(duration_in_seconds / seconds_per_led) * seconds_per_led
+        if (led_filter, pulse_index) != shown:
+            shown = (led_filter, pulse_index)
+            star.off()
+            sleep(2)
+            for idx, led in enumerate(leds):
+                led.value = led_filter[idx]
+                if idx == pulse_index:
+                    led.pulse()
+                sleep(0.25)
+        # Sleep until the image changes
+        sleep(seconds_until_change + 1)
 except KeyboardInterrupt:
     star.close()